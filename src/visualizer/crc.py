@@ -0,0 +1,90 @@
+import numpy as np
+import crcmod
+
+try:
+    import crcmod._crcfunext  # C backend, missing when crcmod was installed without a compiler
+    _CRCMOD_NATIVE = True
+except ImportError:
+    _CRCMOD_NATIVE = False
+
+# CRC-CCITT-FALSE: poly=0x1021, init=0xFFFF, xorOut=0x0000
+_POLY = 0x1021
+_INIT = 0xFFFF
+
+_crc_ccitt_crcmod = crcmod.mkCrcFun(0x10000 | _POLY, initCrc=_INIT, xorOut=0x0000, rev=False)
+
+
+def _make_table() -> np.ndarray:
+    table = np.empty(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ _POLY if crc & 0x8000 else crc << 1
+        table[i] = crc & 0xFFFF
+    return table
+
+
+def _make_sliced_tables(n_slices: int) -> np.ndarray:
+    # tables[k][b]: CRC contribution of byte b followed by k zero bytes
+    tables = np.empty((n_slices, 256), dtype=np.uint16)
+    tables[0] = _make_table()
+    for k in range(1, n_slices):
+        tables[k] = (tables[k - 1] << 8) ^ tables[0][tables[k - 1] >> 8]
+    return tables
+
+
+_SLICES = 8
+_CRC_TABLES = _make_sliced_tables(_SLICES)
+_CRC_TABLE = _CRC_TABLES[0]
+# table index for each byte of a row: the first byte is followed by 7 more, the last by none
+_ROW_TABLE_INDEX = np.arange(_SLICES - 1, -1, -1)
+# the running CRC only mixes into the first two bytes of a row
+_CRC_HIGH_TABLE = _CRC_TABLES[_SLICES - 1].tolist()
+_CRC_LOW_TABLE = _CRC_TABLES[_SLICES - 2].tolist()
+_CRC_BYTE_TABLE = _CRC_TABLE.tolist()
+
+
+def _crc_ccitt_sliced(buf) -> int:
+    data = np.frombuffer(buf, dtype=np.uint8)
+    n_rows = len(data) // _SLICES
+    rows = data[:n_rows * _SLICES].reshape(n_rows, _SLICES)
+
+    # the CRC is linear, so the data part of every 8-byte row is looked up and folded in one vectorized pass
+    row_terms = np.bitwise_xor.reduce(_CRC_TABLES[_ROW_TABLE_INDEX, rows], axis=1).tolist()
+
+    # only carrying the running CRC from row to row stays sequential
+    crc = _INIT
+    for term in row_terms:
+        crc = _CRC_HIGH_TABLE[crc >> 8] ^ _CRC_LOW_TABLE[crc & 0xFF] ^ term
+
+    # remaining tail, byte at a time
+    for byte in data[n_rows * _SLICES:].tolist():
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_BYTE_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+# crc16_ccitt(buf) -> int accepts any buffer-protocol object (bytes, bytearray, memoryview).
+# Pick the backend once: crcmod's C extension, else the Numba JIT, else the NumPy slice-by-8 fallback
+if _CRCMOD_NATIVE:
+    crc16_ccitt = _crc_ccitt_crcmod
+else:
+    # numba is slow to import, so only try it when crcmod's C extension is missing
+    try:
+        import numba
+    except ImportError:
+        numba = None
+
+    if numba is not None:
+        @numba.njit(cache=True, boundscheck=False)
+        def _crc_ccitt_nb(buf, table):
+            crc = _INIT
+            for byte in buf:
+                crc = ((crc << 8) & 0xFFFF) ^ table[((crc >> 8) ^ byte) & 0xFF]
+            return crc
+
+        def _crc_ccitt_numba(buf) -> int:
+            return int(_crc_ccitt_nb(np.frombuffer(buf, dtype=np.uint8), _CRC_TABLE))
+
+        crc16_ccitt = _crc_ccitt_numba
+    else:
+        crc16_ccitt = _crc_ccitt_sliced
@@ -1,21 +1,25 @@
 import os
-from logging import exception
-
 import serial
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from .serial_protocol import SerialProtocol, PacketType
 
 class FuelLevelVisualizer:
     def __init__(self,
                  port: str = None,
                  baud: int = 9600,
-                 emulate: bool = False):
+                 emulate: bool = False,
+                 show: bool = True):
 
         url = port if not emulate else "loop://"
         self.emulate = emulate
+        self.show = show
         try:
-            self.port = serial.serial_for_url(url, baudrate=baud, timeout=1)
+            self.port = serial.serial_for_url(url, baudrate=baud, timeout=1, inter_byte_timeout=0.1)
         except Exception as e:
             print(f"Failed to open serial port '{url}': {e}")
 
@@ -24,47 +28,98 @@ class FuelLevelVisualizer:
         self.protocol.build_packet(packet_type=PacketType.QUERY, n_samples=60)
         print(f"Query Packet: {self.protocol.packet.byte_array.hex(" ").upper()}")
 
+        # output location is fixed, resolve it once
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        output_dir = os.path.join(project_root, "output")
+        os.makedirs(output_dir, exist_ok=True)
+        self._output_path = os.path.join(output_dir, "output.png")
+
+        # the background renderer owns a pyplot-free Agg figure, built once so later plots only swap the line data
+        self._fig = Figure()
+        FigureCanvasAgg(self._fig)
+        self._ax = self._fig.add_subplot()
+        self._line = self._setup_axes(self._ax)
+
+        # one worker renders in the background, so it is the only thread touching that figure
+        self._plot_pool = ThreadPoolExecutor(max_workers=1)
+        self._plot_future = None
+        self._plot_data = None
+
     def visualize(self, duration: int) -> None:
         # query
         self.protocol.build_packet(packet_type=PacketType.QUERY, n_samples=duration)
         self.port.write(self.protocol.packet.byte_array)
+        self.port.flush()
         # read
         if self.emulate:
             response = self.protocol.emulate_response()
         else:
-            response=self.port.read()
+            # HEADER + COMMAND + LENGTH + 4 bytes per sample + CRC
+            expected_length = 6 + 4 * duration + 2
+            if hasattr(self.port, "set_buffer_size"):   # Windows only
+                self.port.set_buffer_size(rx_size=max(4096, expected_length * 4))
+            # 10 bits per byte on the wire, plus a second of slack for the device to answer
+            self.port.timeout = expected_length * 10 / self.port.baudrate + 1
+            response = self.port.read(expected_length)
+            if len(response) != expected_length:
+                raise ValueError(f"Incomplete response: got {len(response)} bytes, expected {expected_length}")
         # parse
-        self.protocol.parse_packet(bytearray(response))
+        self.protocol.parse_packet(response)
         # console output
         print(f"Fuel Levels:\n{self.protocol.data.samples}")
-        # visualize
-        self._plot()
-        # close port
-        self.port.close()
+        # visualize: both arrays are fresh copies, so rendering overlaps the next query safely
+        # native-endian contiguous copy, so matplotlib does not convert it again
+        time_axis = self.protocol.data.samples["TimeStamp"].astype(np.uint16)
+        fuel_level = self._raw_to_percentage(self.protocol.data.samples["FuelLevel"])
+        if self._plot_future is not None:
+            self._plot_future.result()   # surface errors from the previous render
+        self._plot_data = (time_axis, fuel_level)
+        self._plot_future = self._plot_pool.submit(self._plot, time_axis, fuel_level)
 
-    def _plot(self) -> None:
+    def close(self) -> None:
+        try:
+            # finish pending renders before showing the plot and releasing the port
+            self._plot_pool.shutdown(wait=True)
+            if self._plot_future is not None:
+                self._plot_future.result()
+            # show: the window gets its own pyplot figure, only touched from this (main) thread
+            if self.show and self._plot_data is not None:
+                fig, ax = plt.subplots()
+                line = self._setup_axes(ax)
+                self._update_figure(fig, ax, line, *self._plot_data)
+                plt.show()
+        finally:
+            # close port
+            self.port.close()
+
+    def _plot(self, time_axis: np.ndarray, fuel_level: np.ndarray) -> None:
         # plot
-        time_axis = self.protocol.data.samples["TimeStamp"]
-        fuel_level = self._raw_to_percentage(self.protocol.data.samples["FuelLevel"])
-        plt.plot(time_axis, fuel_level)
-        plt.xlabel("Time [s]")
-        plt.ylabel("Fuel Level [%]")
-        plt.grid(True)
-        plt.tight_layout()
+        self._update_figure(self._fig, self._ax, self._line, time_axis, fuel_level)
 
         # save
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        output_dir = os.path.join(project_root, "output")
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "output.png")
-        plt.savefig(output_path, dpi=300)
+        self._fig.savefig(self._output_path, dpi=300)
+
+    @staticmethod
+    def _setup_axes(ax):
+        (line,) = ax.plot([], [])
+        ax.set_xlabel("Time [s]")
+        ax.set_ylabel("Fuel Level [%]")
+        ax.grid(True)
+        return line
 
-        # show
-        plt.show()
+    @staticmethod
+    def _update_figure(fig, ax, line, time_axis: np.ndarray, fuel_level: np.ndarray) -> None:
+        line.set_data(time_axis, fuel_level)
+        ax.relim()
+        ax.autoscale_view()
+        fig.tight_layout()
 
     @staticmethod
-    def _raw_to_percentage(raw_value) -> float:
-        return raw_value / 2**15 * 100.0
+    def _raw_to_percentage(raw_value) -> np.ndarray:
+        # one contiguous float32 copy, scaled in place with a single folded constant
+        percentage = np.asarray(raw_value).astype(np.float32)
+        percentage *= np.float32(100.0 / 2**15)
+        return percentage
 
 
 def get_arguments():
@@ -73,6 +128,7 @@ def get_arguments():
     parser.add_argument("-b", "--baud", type=int, default=115200, help="Baud rate")
     parser.add_argument("-e", "--emulate", action="store_true", help="Enable emulation mode")
     parser.add_argument("-n", "--n_samples", type=int, default=60, help="Number of samples to visualize")
+    parser.add_argument("--no-show", action="store_true", help="Only save the plot, do not open a window")
 
     args = parser.parse_args()
 
@@ -82,8 +138,12 @@ def main():
     args = get_arguments()
     f = FuelLevelVisualizer(port=args.port,
                             baud=args.baud,
-                            emulate=args.emulate)
-    f.visualize(args.n_samples)
+                            emulate=args.emulate,
+                            show=not args.no_show)
+    try:
+        f.visualize(args.n_samples)
+    finally:
+        f.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,8 @@
+import functools
 from enum import Enum
 import numpy as np
 import struct
-import crcmod
+from .crc import crc16_ccitt
 
 class PacketType(Enum):
     QUERY = 0
@@ -12,6 +13,29 @@ class Command(Enum):
     QUERY = 0x1111
     RESPONSE = 0x2222
 
+# plain ints for the hot build/parse paths, avoids Enum attribute lookups per call
+_HDR = Command.HEADER.value
+_CMD_QUERY = Command.QUERY.value
+_CMD_RESP = Command.RESPONSE.value
+
+# PCG64 generator for emulated samples, created once
+_RNG = np.random.default_rng()
+
+_pack = struct.pack
+_pack_into = struct.pack_into
+_unpack_from = struct.unpack_from
+
+# precompiled layouts: HEADER + COMMAND + LENGTH (+ N_SAMPLES for a query)
+_HEADER_STRUCT = struct.Struct(">HHH")
+_QUERY_STRUCT = struct.Struct(">HHHH")
+
+@functools.lru_cache(maxsize=16)
+def _query_bytes(n_samples: int) -> bytes:
+    # query packets only depend on n_samples, so build (and CRC) each one once
+    query = _QUERY_STRUCT.pack(_HDR, _CMD_QUERY, 2, n_samples)
+    crc = crc16_ccitt(query)
+    return query + _pack(">H", crc)
+
 class Packet:
     length: int
     byte_array: bytearray
@@ -25,10 +49,11 @@ class SerialProtocol:
     def __init__(self,
                  use_emulator: bool = False,):
         # CRC-CCITT-FALSE: poly=0x1021, init=0xFFFF, xorOut=0x0000
-        self.crc_ccitt = crcmod.mkCrcFun(0x11021, initCrc=0xFFFF, xorOut=0x0000, rev=False)
+        self.crc_ccitt = crc16_ccitt
 
         self.packet: Packet = Packet()
         self.data: Data = Data()
+        self._last_query_n_samples: int | None = None
 
     def build_packet(self,
                      packet_type: PacketType,
@@ -38,64 +63,75 @@ class SerialProtocol:
         # QUERY: HEADER + COMMAND.QUERY + LENGTH + N_SAMPLES + CRC
         if packet_type == PacketType.QUERY:
             self.packet.length = 2
-            self.packet.byte_array = bytearray(struct.pack(">H", Command.HEADER.value)
-                                               + struct.pack(">H", Command.QUERY.value)
-                                               + struct.pack(">H", self.packet.length)
-                                               + struct.pack(">H", n_samples))
-            crc = self.crc_ccitt(self.packet.byte_array)
-            self.packet.byte_array.extend(struct.pack(">H", crc))
+            self.packet.byte_array = bytearray(_query_bytes(n_samples))
+            self._last_query_n_samples = n_samples
 
         # RESPONSE: HEADER + COMMAND.RESPONSE + LENGTH + DATA ARRAY + CRC
         elif packet_type == PacketType.RESPONSE:
             self.packet.length = len(samples) * 4   # 2 bytes time stamp + 2 bytes fuel level data
-            self.packet.byte_array = bytearray(struct.pack(">H", Command.HEADER.value)
-                                               + struct.pack(">H", Command.RESPONSE.value)
-                                               + struct.pack(">H", self.packet.length))
-            for sample in samples:
-                self.packet.byte_array.extend(struct.pack(">HH", sample["TimeStamp"], sample["FuelLevel"]))
+            # allocate the whole packet once: 6 bytes header + data + 2 bytes CRC
+            total_length = 6 + self.packet.length + 2
+            self.packet.byte_array = bytearray(total_length)
+            _HEADER_STRUCT.pack_into(self.packet.byte_array, 0, _HDR, _CMD_RESP, self.packet.length)
+            # samples already match the wire layout (big-endian u2 pairs), write them in place
+            dtype = [("TimeStamp", ">u2"), ("FuelLevel", ">u2")]
+            np.frombuffer(self.packet.byte_array, dtype=dtype, count=len(samples), offset=6)[:] = samples
 
-            crc = self.crc_ccitt(self.packet.byte_array)
-            self.packet.byte_array.extend(struct.pack(">H", crc))
+            crc = self.crc_ccitt(memoryview(self.packet.byte_array)[:-2])
+            _pack_into(">H", self.packet.byte_array, total_length - 2, crc)
 
         return self.packet
 
-    def parse_packet(self, data_bytes: bytearray) -> Data:
+    def parse_packet(self, data_bytes) -> Data:
+        # accept any buffer (bytes, bytearray, memoryview) without copying it
+        data_view = memoryview(data_bytes)
+
+        # Check framing first, so garbled reads fail before the CRC scan
+        if len(data_view) < 8:
+            raise ValueError(f"Packet too short: {len(data_view)} bytes")
+        header, command, length = _HEADER_STRUCT.unpack_from(data_view, 0)
+        if header != _HDR:
+            raise ValueError(f"Invalid header: {header:04x}")
+        if command not in (_CMD_QUERY, _CMD_RESP):
+            raise ValueError(f"Invalid command: {command:04x}")
+        if command == _CMD_QUERY and length != 2:
+            raise ValueError(f"Invalid query length: {length}, expected 2")
+        if command == _CMD_RESP and length % 4:
+            raise ValueError(f"Invalid response length: {length} is not a multiple of 4")
+        if len(data_view) != 6 + length + 2:
+            raise ValueError(f"Length mismatch: got {len(data_view)} bytes, expected {6 + length + 2}")
+
         # Split data and CRC
-        payload = data_bytes[:-2]
-        crc_recv = struct.unpack(">H", data_bytes[-2:])[0]
+        payload = data_view[:-2]
+        crc_recv, = _unpack_from(">H", data_view, len(data_view) - 2)
 
         # Validate CRC
         crc_calc = self.crc_ccitt(payload)
         if crc_recv != crc_calc:
             raise ValueError(f"CRC mismatch: got {crc_recv:04x}, expected {crc_calc:04x}")
 
-        # Parse header, command, length
-        header, command, length = struct.unpack(">HHH", payload[0:6])
-        if header != Command.HEADER.value:
-            raise ValueError(f"Invalid header: {header:04x}")
-
         self.packet = Packet()
         self.packet.length = length
 
-        if command == Command.QUERY.value:
-            n_samples, = struct.unpack(">H", payload[6:8])
+        if command == _CMD_QUERY:
+            n_samples, = _unpack_from(">H", payload, 6)
             self.data.type = PacketType.QUERY
             self.data.n_samples = n_samples
 
-        elif command == Command.RESPONSE.value:
+        elif command == _CMD_RESP:
             self.data.type = PacketType.RESPONSE
             self.data.n_samples = length // 4
 
-            samples_section = payload[6:6 + length]
             dtype = [("TimeStamp", ">u2"), ("FuelLevel", ">u2")]
-            self.data.samples = np.frombuffer(samples_section, dtype=dtype)
+            self.data.samples = np.frombuffer(payload, dtype=dtype, count=length // 4, offset=6)
 
         return self.data
 
     def emulate_response(self) -> bytearray:
-        # query data
-        self.parse_packet(self.packet.byte_array)
-        n_samples = self.data.n_samples
+        # query data, remembered by build_packet so our own query is not parsed again
+        n_samples = self._last_query_n_samples
+        if n_samples is None:
+            raise ValueError("no QUERY built yet")
         random_samples = self._generate_random_samples(n_samples)
         packet = self.build_packet(packet_type=PacketType.RESPONSE, samples=random_samples)
         print(f"Response Packet: {packet.byte_array.hex(" ").upper()}")
@@ -103,10 +139,12 @@ class SerialProtocol:
 
     @staticmethod
     def _generate_random_samples(n_samples: int) -> np.ndarray:
-        start_time_stamp = np.random.randint(0, 3600 - n_samples)
+        start_time_stamp = int(_RNG.integers(0, 3600 - n_samples))
         dtype = [("TimeStamp", ">u2"), ("FuelLevel", ">u2")]
-        samples = np.zeros(n_samples, dtype=dtype)
-        samples["TimeStamp"] = np.arange(start_time_stamp, start_time_stamp + n_samples, dtype=np.uint16)
-        samples["FuelLevel"] = np.random.randint(0, 2**15, size=n_samples, dtype=np.uint16)
-        return samples
+        # fill little-endian (TimeStamp, FuelLevel) pairs, then flip the whole block to big-endian once
+        raw = np.empty((n_samples, 2), dtype="<u2")
+        raw[:, 0] = np.arange(start_time_stamp, start_time_stamp + n_samples, dtype=np.uint16)
+        raw[:, 1] = _RNG.integers(0, 2**15, size=n_samples, dtype=np.uint16)
+        raw.byteswap(inplace=True)
+        return raw.view(dtype).reshape(-1)
 